@@ -0,0 +1,40 @@
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse a JSON document"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj: Any, indent: bool = True) -> bytes:
+    """Serialize obj to UTF-8 encoded JSON (orjson only supports 2 space indents)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+def read(path: Union[str, Path]) -> Any:
+    """Read and parse a JSON file with a single read call"""
+    return loads(Path(path).read_bytes())
+
+def write(path: Union[str, Path], obj: Any, indent: bool = True):
+    """Serialize obj and write it to path with a single write call.
+    The data goes to a temporary file that then replaces path, so a failed write never leaves a truncated file.
+    The temporary name is unique per process and thread, so concurrent writers never share it."""
+    path = Path(path)
+    payload = dumps(obj, indent)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
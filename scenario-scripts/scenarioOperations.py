@@ -1,5 +1,7 @@
 import json
 import logging
+import functools
+import operator
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Union, Optional
 from enum import Enum
@@ -26,27 +28,50 @@ class LogicalOp(Enum):
     NAND = "nand"
     XOR = "xor"
 
+# Arithmetic applied by each numeric operation (SCALE multiplies by the operator adjustment)
+ARITHMETIC_OPERATORS = {
+    Operation.ADD: operator.add,
+    Operation.MULTIPLY: operator.mul,
+    Operation.DIVIDE: operator.truediv,
+    Operation.SCALE: operator.mul
+}
+
+COMPARISON_OPERATORS = {
+    Comparison.EQUALS: operator.eq,
+    Comparison.NOT_EQUALS: operator.ne,
+    Comparison.GREATER_THAN: operator.gt,
+    Comparison.LESS_THAN: operator.lt
+}
+
+_MISSING = object()
+
+@functools.lru_cache(maxsize=128, typed=True)
+def compile_filter(property: str, comparison: Comparison, value: Any) -> Callable[[Dict], bool]:
+    """Build the predicate for a filter once, so evaluating it per object
+    doesn't dispatch on the comparison again"""
+    compare = COMPARISON_OPERATORS.get(comparison)
+    if compare is None:
+        def predicate(obj: Dict) -> bool:
+            return False
+    else:
+        def predicate(obj: Dict) -> bool:
+            target = obj.get(property, _MISSING)
+            return target is not _MISSING and compare(target, value)
+    return predicate
+
 class Filter:
     def __init__(self, property: str, comparison: Comparison, value: Any):
         self.property = property
         self.comparison = comparison
         self.value = value
+        try:
+            self._predicate = compile_filter(property, comparison, value)
+        except TypeError:
+            # Unhashable filter values can't be cached
+            self._predicate = compile_filter.__wrapped__(property, comparison, value)
 
     def evaluate(self, obj: Dict) -> bool:
-        if self.property not in obj:
-            return False
-            
-        target = obj[self.property]
-        
-        if self.comparison == Comparison.EQUALS:
-            return target == self.value
-        elif self.comparison == Comparison.NOT_EQUALS:
-            return target != self.value
-        elif self.comparison == Comparison.GREATER_THAN:
-            return target > self.value
-        elif self.comparison == Comparison.LESS_THAN:
-            return target < self.value
-        return False
+        return self._predicate(obj)
 
 class FilterGroup:
     def __init__(self, filters: List[Filter], logical_op: LogicalOp = LogicalOp.AND):
@@ -54,7 +79,8 @@ class FilterGroup:
         self.logical_op = logical_op
 
     def evaluate(self, obj: Dict) -> bool:
-        results = [f.evaluate(obj) for f in self.filters]
+        # Generators let all/any stop at the first deciding filter
+        results = (f.evaluate(obj) for f in self.filters)
         
         if self.logical_op == LogicalOp.AND:
             return all(results)
@@ -63,7 +89,13 @@ class FilterGroup:
         elif self.logical_op == LogicalOp.NAND:
             return not all(results)
         elif self.logical_op == LogicalOp.XOR:
-            return sum(results) == 1
+            matched = 0
+            for result in results:
+                if result:
+                    matched += 1
+                    if matched > 1:
+                        return False
+            return matched == 1
         return False
         
 def apply_operation(data: Dict, 
@@ -73,11 +105,21 @@ def apply_operation(data: Dict,
                    value: Any = None,
                    operator_adjustment: float = 1.0) -> Dict:
     """Apply operation to filtered objects in the data"""
-    logging.info(f"Applying operation {operation} to property {target_property}")
+    logging.info("Applying operation %s to property %s", operation, target_property)
     
     # Keep track of nodes to move
     nodes_to_move = []
     
+    # Checked once so the per-object debug messages cost nothing when DEBUG is off
+    debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+    
+    # The arithmetic and its operand are the same for every matching object, so resolve them once
+    arithmetic = ARITHMETIC_OPERATORS.get(operation)
+    if operation == Operation.SCALE:
+        operand = operator_adjustment
+    elif arithmetic is not None:
+        operand = value * operator_adjustment
+    
     def find_and_update_target(nodes: List[Dict], target_id: str, new_children: List[Dict]) -> bool:
         """Find target node and update its children"""
         for node in nodes:
@@ -86,7 +128,7 @@ def apply_operation(data: Dict,
                 if 'child_nodes' not in node:
                     node['child_nodes'] = []
                 node['child_nodes'].extend(new_children)
-                logging.debug(f"Updated target node {target_id}, now has {len(node['child_nodes'])} children")
+                logging.debug("Updated target node %s, now has %d children", target_id, len(node['child_nodes']))
                 return True
             if 'child_nodes' in node:
                 if find_and_update_target(node['child_nodes'], target_id, new_children):
@@ -100,21 +142,15 @@ def apply_operation(data: Dict,
                 current_value = float(current_value)
             except ValueError:
                 # If it's not a numeric string, we can't perform math operations
-                if operation in [Operation.ADD, Operation.MULTIPLY, Operation.DIVIDE, Operation.SCALE]:
-                    logging.warning(f"Cannot perform {operation.value} on non-numeric value: {current_value}")
+                if arithmetic is not None:
+                    logging.warning("Cannot perform %s on non-numeric value: %s", operation.value, current_value)
                     return current_value
 
-        if operation == Operation.ADD:
-            return current_value + (value * operator_adjustment)
-        elif operation == Operation.MULTIPLY:
-            return current_value * (value * operator_adjustment)
-        elif operation == Operation.DIVIDE:
-            if value * operator_adjustment == 0:
+        if arithmetic is not None:
+            if operation == Operation.DIVIDE and operand == 0:
                 logging.warning("Cannot divide by zero")
                 return current_value
-            return current_value / (value * operator_adjustment)
-        elif operation == Operation.SCALE:
-            return current_value * operator_adjustment
+            return arithmetic(current_value, operand)
         elif operation == Operation.CHANGE:
             return value
         return current_value
@@ -129,7 +165,8 @@ def apply_operation(data: Dict,
         
         # Check if this object matches our filter
         if filter_group.evaluate(obj):
-            logging.debug(f"Found matching object: {obj}")
+            if debug:
+                logging.debug("Found matching object: %s", obj)
             if operation == Operation.REMOVE:
                 logging.debug("Removing object")
                 return None
@@ -139,20 +176,23 @@ def apply_operation(data: Dict,
                 if 'child_nodes' in obj:
                     moved_node['child_nodes'] = obj['child_nodes']
                 nodes_to_move.append(moved_node)
-                logging.debug(f"Marked node {obj.get('id')} for moving with {len(obj.get('child_nodes', []))} children")
+                if debug:
+                    logging.debug("Marked node %s for moving with %d children", obj.get('id'), len(obj.get('child_nodes', [])))
                 return None  # Remove from original location
             elif operation == Operation.ADD_PROPERTY:
                 if target_property not in obj:
                     result = obj.copy()
                     result[target_property] = value
-                    logging.debug(f"Added property {target_property} with value {value}")
+                    if debug:
+                        logging.debug("Added property %s with value %s", target_property, value)
                     return result
                 return obj
             elif target_property in obj:
                 result = obj.copy()
                 current_value = obj[target_property]
                 result[target_property] = process_value(current_value)
-                logging.debug(f"Modified {target_property} from {current_value} to {result[target_property]}")
+                if debug:
+                    logging.debug("Modified %s from %s to %s", target_property, current_value, result[target_property])
                 return result
         
         return obj
@@ -179,9 +219,9 @@ def apply_operation(data: Dict,
         
         # Update target node with collected nodes
         if operation == Operation.MOVE and nodes_to_move:
-            logging.debug(f"Moving {len(nodes_to_move)} nodes to target {target_property}")
+            logging.debug("Moving %d nodes to target %s", len(nodes_to_move), target_property)
             if not find_and_update_target(data['root_nodes'], str(target_property), nodes_to_move):
-                logging.error(f"Failed to find target node {target_property} for updating")
+                logging.error("Failed to find target node %s for updating", target_property)
 
         return data
     else:
@@ -1,333 +1,38 @@
+import os
 import sys
-import json
-import zipfile
-import shutil
+import re
+import collections
 from pathlib import Path
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                            QPushButton, QLabel, QListWidget, QFileDialog, QHBoxLayout, QLineEdit, QSizePolicy, QComboBox, QCheckBox, QTextEdit, QTableWidget, QTableWidgetItem, QHeaderView, QScrollArea, QMessageBox, QGroupBox)
-from PyQt6.QtCore import Qt, QMimeData, QFileSystemWatcher, QPointF, QTimer, QRectF
+                            QPushButton, QLabel, QListWidget, QListWidgetItem, QFileDialog, QHBoxLayout, QLineEdit, QSizePolicy, QComboBox, QCheckBox, QTextEdit, QTableWidget, QTableWidgetItem, QHeaderView, QScrollArea, QMessageBox, QGroupBox)
+from PyQt6.QtCore import Qt, QEvent, QMimeData, QFileSystemWatcher, QPointF, QLineF, QTimer, QRectF, QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
 from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QPainter, QPen, QColor, QBrush
 from scenarioOperations import Operation, Comparison, LogicalOp, Filter, FilterGroup, apply_operation
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Dict, Any
 from version_checker import VersionChecker
+import fast_json
+# ScenarioTool lives in a Qt-free module; it is re-exported here for existing imports
+from scenarioCore import ScenarioTool, COMPRESSION_POLICIES
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
-class ScenarioTool:
-    def __init__(self):
-        # Get base directory
-        if getattr(sys, 'frozen', False):
-            base_dir = Path(sys.executable).parent
-        else:
-            base_dir = Path(__file__).parent
-        
-        # Base directories
-        self.output_dir = base_dir / "output"
-        
-        # User and community directories
-        self.user_dir = base_dir / "user"
-        self.community_dir = base_dir / "community"
-        
-        # Template directories
-        self.templates_dirs = {
-            'user': self.user_dir / "templates",
-            'community': self.community_dir / "templates"
-        }
-        
-        # Script directories
-        self.script_dirs = {
-            'user': {
-                'chart': self.user_dir / "scripts/chart",
-                'generator': self.user_dir / "scripts/generator"
-            },
-            'community': {
-                'chart': self.community_dir / "scripts/chart",
-                'generator': self.community_dir / "scripts/generator"
-            }
-        }
-        
-        # Working directories stay the same
-        self.working_dirs = {
-            'chart': Path("working/chart"),
-            'generator': Path("working/generator")
-        }
-        
-        # Create all necessary directories
-        for directory in [self.output_dir, *self.working_dirs.values()]:
-            directory.mkdir(parents=True, exist_ok=True)
-            
-        for templates_dir in self.templates_dirs.values():
-            for type_dir in ['chart', 'generator']:
-                (templates_dir / type_dir).mkdir(parents=True, exist_ok=True)
-                
-        for scripts in self.script_dirs.values():
-            for script_dir in scripts.values():
-                script_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Expected files in a scenario
-        self.required_files = [
-            "galaxy_chart_fillings.json",
-            "scenario_info.json"
-        ]
+# Save directory restored by the "Use Default Output" button
+DEFAULT_OUTPUT_DIR = str(Path("output"))
 
-        # ToDo: require galaxy_chart_generator_params.json for generator scenarios and galaxy_chart.json for chart scenarios
-        
-        self.current_type = None  # Will store 'chart' or 'generator'
-    
-    def determine_scenario_type(self, template_name: str) -> Optional[str]:
-        """Determine if this is a chart or generator scenario."""
-        try:
-            parts = template_name.split(': ')
-            if len(parts) != 2:
-                logging.error(f"Invalid template format: {template_name}")
-                return None
-            
-            source, name = parts
-            source_dir = self.templates_dirs.get(source.split('/')[0])
-            if not source_dir:
-                logging.error(f"Unknown source: {source}")
-                return None
-            
-            # Construct the full path to the template
-            template_path = source_dir / source.split('/')[1] / f"{name}.scenario"
-            
-            with zipfile.ZipFile(template_path, 'r') as zip_ref:
-                files = zip_ref.namelist()
-                if "galaxy_chart_generator_params.json" in files:
-                    return 'generator'
-                elif "galaxy_chart.json" in files:
-                    return 'chart'
-        except Exception as e:
-            logging.error(f"Error determining scenario type: {str(e)}")
-        return None
-    
-    def extract_scenario(self, scenario_path: Path) -> bool:
-        """Extract a scenario file and determine its type"""
-        try:
-            # Clear working directories
-            for working_dir in self.working_dirs.values():
-                if working_dir.exists():
-                    shutil.rmtree(working_dir)
-                    working_dir.mkdir(parents=True)
-            
-            # Extract scenario
-            with zipfile.ZipFile(scenario_path, 'r') as zip_ref:
-                # Check contents to determine type
-                contents = zip_ref.namelist()
-                
-                # Check for required files
-                has_required = all(f in contents for f in self.required_files)
-                if not has_required:
-                    logging.error("Missing required scenario files")
-                    return False
-                
-                # Determine type based on specific files
-                if "galaxy_chart.json" in contents:
-                    self.current_type = 'chart'
-                elif "galaxy_chart_generator_params.json" in contents:
-                    self.current_type = 'generator'
-                else:
-                    logging.error("Unknown scenario type")
-                    return False
-                
-                # Extract to appropriate working directory
-                zip_ref.extractall(self.working_dirs[self.current_type])
-                logging.info(f"Extracted scenario as type: {self.current_type}")
-                return True
-                
-        except Exception as e:
-            logging.error(f"Error extracting scenario: {e}")
-            return False
-    
-    def apply_script(self, script_name: str) -> tuple[bool, str, float]:
-        """Apply a script from the appropriate directory. Returns (success, message, execution_time)"""
-        if not self.current_type:
-            msg = "No scenario loaded"
-            logging.error(msg)
-            return False, msg, 0
-        
-        import time
-        start_time = time.time()
-        
-        try:
-            # Remove any .py extension if present
-            script_name = script_name.replace('.py', '')
-            script_path = self.script_dirs['user'][self.current_type] / f"{script_name}.py"
-            
-            # If not found in user scripts, try community scripts
-            if not script_path.exists():
-                script_path = self.script_dirs['community'][self.current_type] / f"{script_name}.py"
-            
-            if not script_path.exists():
-                msg = f"Script not found: {script_name}"
-                logging.error(msg)
-                return False, msg, 0
-            
-            logging.info(f"Running script: {script_name} from {script_path}")
-            
-            # Import and run the script in a controlled environment
-            import importlib.util
-            spec = importlib.util.spec_from_file_location(script_name, script_path)
-            module = importlib.util.module_from_spec(spec)
-            
-            try:
-                spec.loader.exec_module(module)
-            except Exception as e:
-                msg = f"Error loading script {script_name}: {str(e)}"
-                logging.error(msg, exc_info=True)
-                return False, msg, time.time() - start_time
-            
-            if not hasattr(module, 'transform_scenario'):
-                msg = f"Script {script_name} does not have a transform_scenario function"
-                logging.error(msg)
-                return False, msg, time.time() - start_time
-            
-            try:
-                module.transform_scenario(self.working_dirs[self.current_type])
-                execution_time = time.time() - start_time
-                msg = f"Successfully applied script: {script_name} ({execution_time:.2f}s)"
-                logging.info(msg)
-                return True, msg, execution_time
-            except Exception as e:
-                msg = f"Error in script {script_name}: {str(e)}"
-                logging.error(msg, exc_info=True)
-                return False, msg, time.time() - start_time
-            
-        except Exception as e:
-            msg = f"Unexpected error applying script: {str(e)}"
-            logging.error(msg, exc_info=True)
-            return False, msg, time.time() - start_time
-    
-    def create_scenario(self, output_name: str, source_dir: Path = None) -> bool:
-        """Create .scenario file from json files"""
-        if source_dir is None:
-            source_dir = self.working_dirs[self.current_type]
-            
-        try:
-            output_path = self.output_dir / f"{output_name}.scenario"
-            
-            # Define required files based on scenario type
-            required_files = [
-                "galaxy_chart_fillings.json",
-                "scenario_info.json"
-            ]
-            
-            # Add type-specific required file
-            if self.current_type == 'generator':
-                required_files.append("galaxy_chart_generator_params.json")
-            elif self.current_type == 'chart':
-                required_files.append("galaxy_chart.json")
-            
-            logging.debug(f"Creating {self.current_type} scenario with required files: {required_files}")
-            
-            with zipfile.ZipFile(output_path, 'w') as zip_ref:
-                missing_files = []
-                for file in required_files:
-                    file_path = source_dir / file
-                    if file_path.exists():
-                        zip_ref.write(file_path, file)
-                        logging.debug(f"Added file to scenario: {file}")
-                    else:
-                        missing_files.append(file)
-                        logging.error(f"Missing required file: {file}")
-                
-                if missing_files:
-                    logging.error(f"Failed to create scenario due to missing files: {missing_files}")
-                    return False
-                
-            logging.info(f"Successfully created scenario at: {output_path}")
-            return True
-            
-        except Exception as e:
-            logging.error(f"Error creating scenario: {str(e)}", exc_info=True)
-            return False
-    
-    def load_template(self, template_name: str) -> tuple[bool, str]:
-        """Load a template by name."""
-        try:
-            # Determine the correct path based on the template name
-            parts = template_name.split(': ')
-            if len(parts) != 2:
-                logging.error(f"Invalid template format: {template_name}")
-                return False, "Invalid template format"
-            
-            source, name = parts
-            source_dir = self.templates_dirs.get(source.split('/')[0])
-            if not source_dir:
-                logging.error(f"Unknown source: {source}")
-                return False, "Unknown source"
-            
-            # Construct the full path to the template
-            template_path = source_dir / source.split('/')[1] / f"{name}.scenario"
-            
-            if not template_path.exists():
-                logging.error(f"Template not found: {template_name}")
-                return False, f"Template not found: {template_name}"
-            
-            # Extract the template
-            with zipfile.ZipFile(template_path, 'r') as zip_ref:
-                zip_ref.extractall(self.working_dirs['chart'])
-            
-            logging.info(f"Loaded template: {template_name}")
-            self.current_type = self.determine_scenario_type(template_name)
-            return True, "Template loaded successfully"
-        except Exception as e:
-            logging.error(f"Error loading template: {str(e)}")
-            return False, f"Error loading template: {str(e)}"
-    
-    def save_as_template(self, template_name: str) -> bool:
-        """Save the current scenario as a template"""
-        if not self.current_type:
-            print("No scenario loaded")
-            return False
-        
-        try:
-            # Create template directory if it doesn't exist
-            template_dir = self.templates_dirs[self.current_type]
-            template_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Save directly as .scenario file
-            template_path = template_dir / f"{template_name}.scenario"
-            if template_path.exists():
-                print(f"A template with this name already exists: {template_name}")
-                return False
-            
-            # Create scenario file directly in template directory
-            return self.create_scenario(template_name, template_path.parent)
-            
-        except Exception as e:
-            print(f"Error saving template: {e}")
-            return False
+# Coarsest directory mtime resolution to expect (FAT/exFAT use 2 seconds). A directory listing
+# is only trusted to match its mtime once the mtime is at least this old.
+MTIME_RESOLUTION_NS = 2_000_000_000
 
+# GetDriveTypeW results for drives that aren't worth probing for game folders
+DRIVE_REMOTE = 4
+DRIVE_CDROM = 5
 
-    
-    def relocate_template(self, template_path: Path, correct_type: str) -> tuple[Path | None, str]:
-        """Move template to the correct type directory"""
-        # Construct new path
-        new_path = template_path.parent.parent / correct_type / template_path.name
-        message = f"Moving template from {template_path.parent.name} to {correct_type} folder"
-        logging.debug(f"Relocating template from {template_path} to {new_path}")
-        
-        try:
-            # Create directory if it doesn't exist
-            new_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Move the file
-            if new_path.exists():
-                message = f"Cannot move template: already exists in {correct_type} folder"
-                logging.warning(f"Template already exists at destination: {new_path}")
-                return None, message
-            
-            template_path.rename(new_path)
-            logging.info(f"Successfully relocated template to {new_path}")
-            return new_path, message
-        except Exception as e:
-            message = f"Failed to move template: {str(e)}"
-            logging.error(f"Failed to relocate template: {e}")
-            return None, message
-
+# Numeric literals accepted in value fields
+INT_PATTERN = re.compile(r'-?\d+')
+FLOAT_PATTERN = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
 
 class ScenarioToolGUI(QMainWindow):
     def __init__(self):
@@ -336,6 +41,24 @@ class ScenarioToolGUI(QMainWindow):
         self.scenario_tool = ScenarioTool()
         self.where_clauses = []
         
+        # (directory mtime, sorted file stems) per listed directory
+        self._dir_listing: Dict[Path, tuple[int, List[str]]] = {}
+        # Lists the directories of a refresh concurrently, so slow drives don't add up
+        self._scan_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="dir-scan")
+        # Watched directory -> (list kind, source, scenario type)
+        self._watched_dirs: Dict[Path, tuple[str, str, str]] = {}
+        
+        # Set when a watched directory changed while the lists couldn't be rebuilt
+        self._scripts_dirty = False
+        self._stale_template_dirs = set()
+        
+        # Script and property operation running on the thread pool, if any
+        self._script_runner = None
+        self._operation_runner = None
+        
+        # Epic scenarios folder once it has been found, the fallback path is never kept
+        self._epic_scenarios_path = None
+        
         # Load stylesheet first
         self.load_stylesheet()
         
@@ -344,12 +67,11 @@ class ScenarioToolGUI(QMainWindow):
         
         # Setup remaining components
         self.setup_file_watchers()
-        self.update_template_list()
-        self.update_script_list()
         
         # Open in full screen
         self.showMaximized()
         
+        # The network request runs on the thread pool, so it never blocks the window
         self.check_for_updates()
     
     def init_ui(self):
@@ -406,6 +128,13 @@ class ScenarioToolGUI(QMainWindow):
         self.name_input = QLineEdit()
         name_layout.addWidget(name_label)
         name_layout.addWidget(self.name_input)
+        
+        self.compression_combo = QComboBox()
+        self.compression_combo.addItems(COMPRESSION_POLICIES.keys())
+        self.compression_combo.setCurrentText(self.scenario_tool.compression)
+        self.compression_combo.currentTextChanged.connect(self.update_compression)
+        name_layout.addWidget(QLabel('Compression:'))
+        name_layout.addWidget(self.compression_combo)
         options_layout.addLayout(name_layout)
         
         dir_buttons_layout = QHBoxLayout()
@@ -540,19 +269,27 @@ class ScenarioToolGUI(QMainWindow):
                 with open(style_path, 'r') as f:
                     self.setStyleSheet(f.read())
             else:
-                logging.warning(f"Warning: style.qss not found at {style_path}")
+                logging.warning("Warning: style.qss not found at %s", style_path)
         except Exception as e:
-            logging.error(f"Error loading stylesheet: {e}")
+            logging.error("Error loading stylesheet: %s", e)
+    
+    def working_files_busy(self) -> bool:
+        """Whether a background task is using the working files, so no scenario may be loaded over them"""
+        return self._script_runner is not None or self._operation_runner is not None
     
     def dragEnterEvent(self, event: QDragEnterEvent):
-        if event.mimeData().hasUrls():
+        if event.mimeData().hasUrls() and not self.working_files_busy():
             event.accept()
         else:
             event.ignore()
             
     def dropEvent(self, event: QDropEvent):
-        files = [u.toLocalFile() for u in event.mimeData().urls()]
-        for file_path in files:
+        if self.working_files_busy():
+            event.ignore()
+            return
+        # Stop at the first scenario without converting the remaining URLs
+        for url in event.mimeData().urls():
+            file_path = url.toLocalFile()
             if file_path.endswith('.scenario'):
                 self.handle_scenario_file(Path(file_path))
                 break
@@ -568,27 +305,25 @@ class ScenarioToolGUI(QMainWindow):
                 self.save_scenario_btn.setEnabled(True)
                 self.apply_operation_btn.setEnabled(True)
                 
-                # Update lists
+                # Scripts depend on the scenario type; templates don't
                 self.update_script_list()
-                self.update_template_list()
                 
-                logging.info(f"Successfully loaded scenario: {file_path}")
+                logging.info("Successfully loaded scenario: %s", file_path)
             else:
                 self.status_label.setText('Error loading scenario')
-                logging.error(f"Failed to load scenario: {file_path}")
+                logging.error("Failed to load scenario: %s", file_path)
         except Exception as e:
             self.status_label.setText(f'Error: {str(e)}')
-            logging.error(f"Error loading scenario: {str(e)}", exc_info=True)
+            logging.error("Error loading scenario: %s", e, exc_info=True)
         
         # Update galaxy viewer if this is a chart scenario
         if self.scenario_tool.current_type == 'chart':
             try:
                 chart_path = self.scenario_tool.working_dirs['chart'] / "galaxy_chart.json"
-                with open(chart_path) as f:
-                    chart_data = json.load(f)
+                chart_data = self.scenario_tool.read_json(chart_path)
                 self.galaxy_viewer.set_data(chart_data)
             except Exception as e:
-                logging.error(f"Error loading galaxy chart data: {e}")
+                logging.error("Error loading galaxy chart data: %s", e)
     
     def run_script(self):
         if self.script_list.currentItem():
@@ -596,7 +331,7 @@ class ScenarioToolGUI(QMainWindow):
             
             try:
                 source, script_name = full_script_name.split(": ", 1)
-                logging.debug(f"Executing script from {source}: {script_name}")
+                logging.debug("Executing script from %s: %s", source, script_name)
                 
                 # Get the correct script directory
                 script_dir = self.scenario_tool.script_dirs[source][self.scenario_tool.current_type]
@@ -604,54 +339,77 @@ class ScenarioToolGUI(QMainWindow):
                 
                 # Update status before running
                 self.status_label.setText(f"Running script: {script_name}...")
-                self.status_label.setProperty("status", "running")
-                self.style().unpolish(self.status_label)
-                self.style().polish(self.status_label)
-                
-                # Disable controls during execution
-                self.script_list.setEnabled(False)
-                QApplication.processEvents()  # Force UI update
+                self.set_status_state("running")
                 
-                try:
-                    success, message, execution_time = self.scenario_tool.apply_script(script_name)
-                    
-                    if success:
-                        status_msg = f"Script completed in {execution_time:.2f}s"
-                        self.status_label.setProperty("status", "success")
-                        self.status_label.setText(f"{message}\nScenario updated successfully!")
-                        
-                        # Refresh the galaxy viewer with the updated data
-                        if self.scenario_tool.current_type == 'chart':
-                            chart_path = self.scenario_tool.working_dirs['chart'] / "galaxy_chart.json"
-                            with open(chart_path, 'r') as f:
-                                chart_data = json.load(f)
-                            self.galaxy_viewer.set_data(chart_data)
-                            self.galaxy_viewer._collect_node_positions()
-                            self.galaxy_viewer.update()
-                    
-                    else:
-                        status_msg = f"Script failed after {execution_time:.2f}s"
-                        self.status_label.setProperty("status", "error")
-                        self.status_label.setText(message)
-                    
-                    self.status_label.setText(status_msg)
-                    
-                except Exception as e:
-                    self.status_label.setText("Script execution failed")
-                    self.status_label.setProperty("status", "error")
-                    self.status_label.setText(f"Error running script: {str(e)}")
-                    logging.error("Error in script execution", exc_info=True)
+                # Disable controls that touch the working files while the script runs
+                self.set_script_controls_enabled(False)
                 
-                finally:
-                    # Re-enable controls
-                    self.script_list.setEnabled(True)
-                    self.style().unpolish(self.status_label)
-                    self.style().polish(self.status_label)
+                # Run the script on the thread pool so the window stays responsive
+                runner = ScriptRunner(self.scenario_tool, script_name)
+                runner.signals.finished.connect(self.on_script_finished)
+                self._script_runner = runner
+                QThreadPool.globalInstance().start(runner)
                 
             except ValueError as e:
-                logging.error(f"Invalid script name format: {full_script_name}")
+                logging.error("Invalid script name format: %s", full_script_name)
                 self.status_label.setText("Invalid script format")
     
+    @pyqtSlot(bool, str, float)
+    def on_script_finished(self, success: bool, message: str, execution_time: float):
+        """Update the UI once a script finished running on the thread pool"""
+        self._script_runner = None
+        try:
+            if success:
+                status_msg = f"Script completed in {execution_time:.2f}s"
+                self.set_status_state("success")
+                self.status_label.setText(f"{message}\nScenario updated successfully!")
+                
+                # Refresh the galaxy viewer with the updated data
+                if self.scenario_tool.current_type == 'chart':
+                    chart_path = self.scenario_tool.working_dirs['chart'] / "galaxy_chart.json"
+                    chart_data = self.scenario_tool.read_json(chart_path)
+                    self.galaxy_viewer.set_data(chart_data)
+            
+            else:
+                status_msg = f"Script failed after {execution_time:.2f}s"
+                self.set_status_state("error")
+                self.status_label.setText(message)
+            
+            self.status_label.setText(status_msg)
+            
+        except Exception as e:
+            self.status_label.setText("Script execution failed")
+            self.set_status_state("error")
+            self.status_label.setText(f"Error running script: {str(e)}")
+            logging.error("Error in script execution", exc_info=True)
+        
+        finally:
+            # Re-enable controls
+            self.set_script_controls_enabled(True)
+    
+    def set_status_state(self, state: str):
+        """Set the status label's styling state, re-polishing it only when the state changes"""
+        if self.status_label.property("status") == state:
+            return
+        self.status_label.setProperty("status", state)
+        style = self.status_label.style()
+        style.unpolish(self.status_label)
+        style.polish(self.status_label)
+    
+    def set_script_controls_enabled(self, enabled: bool):
+        """Toggle the controls that must not be used while a script is running"""
+        self.script_list.setEnabled(enabled)
+        self.load_template_btn.setEnabled(enabled)
+        self.save_scenario_btn.setEnabled(enabled)
+        self.template_dir_btn.setEnabled(enabled)
+        self.apply_operation_btn.setEnabled(enabled)
+        # The viewer saves node edits straight to galaxy_chart.json
+        self.galaxy_viewer.setEnabled(enabled)
+        if enabled:
+            self.update_run_button_state()
+        else:
+            self.run_script_btn.setEnabled(False)
+    
     def load_template(self):
         selected = self.template_list.currentItem()
         if not selected:
@@ -669,11 +427,13 @@ class ScenarioToolGUI(QMainWindow):
         if len(source_path) == 1:  # No type subdirectory
             template_dir = self.scenario_tool.templates_dirs[source_path[0]]
             template_path = template_dir / f"{template_name}.scenario"
-        else:  # Has type subdirectory
+            scenario_type = None
+        else:  # Has type subdirectory, which already tells the scenario type
             template_dir = self.scenario_tool.templates_dirs[source_path[0]] / source_path[1]
             template_path = template_dir / f"{template_name}.scenario"
+            scenario_type = source_path[1]
         
-        if self.scenario_tool.extract_scenario(template_path):
+        if self.scenario_tool.extract_scenario(template_path, scenario_type=scenario_type):
             self.status_label.setText(f'Loaded template: {template_name}')
             # Enable buttons
             self.run_script_btn.setEnabled(True)
@@ -688,11 +448,10 @@ class ScenarioToolGUI(QMainWindow):
             if self.scenario_tool.current_type == 'chart':
                 chart_path = self.scenario_tool.working_dirs['chart'] / "galaxy_chart.json"
                 if chart_path.exists():
-                    with open(chart_path) as f:
-                        chart_data = json.load(f)
+                    chart_data = self.scenario_tool.read_json(chart_path)
                     self.galaxy_viewer.set_data(chart_data)
             
-            logging.info(f"Successfully loaded template: {template_path}")
+            logging.info("Successfully loaded template: %s", template_path)
     
     def save_scenario(self):
         if not self.name_input.text():
@@ -709,18 +468,55 @@ class ScenarioToolGUI(QMainWindow):
     
     def update_script_list(self):
         """Update the list of available scripts based on the loaded template."""
+        self._scripts_dirty = False
         self.script_list.clear()
         if self.scenario_tool.current_type:
             all_scripts = []
-            # Get scripts from both user and community directories
-            for source, scripts in self.scenario_tool.script_dirs.items():
-                script_dir = scripts[self.scenario_tool.current_type]
-                if script_dir.exists():
-                    scripts = [f"{source}: {p.stem}" 
-                              for p in script_dir.glob("*.py")
-                              if p.stem != "__init__"]
-                    all_scripts.extend(scripts)
-            self.script_list.addItems(sorted(all_scripts))
+            # Get scripts from both user and community directories; the listings are sorted
+            # and skip __init__, so visiting the sources in order keeps the list sorted
+            groups = [(f"{source}: ", scripts[self.scenario_tool.current_type])
+                      for source, scripts in sorted(self.scenario_tool.script_dirs.items())]
+            for (prefix, _dir), stems in zip(groups, self._list_directories([d for _, d in groups], ".py")):
+                all_scripts.extend(prefix + stem for stem in stems)
+            self.script_list.addItems(all_scripts)
+    
+    def _list_directories(self, directories: List[Path], suffix: str) -> List[List[str]]:
+        """List several directories at once on the scan pool, see _list_directory.
+        Only the listing runs on the pool, the results are returned to the calling (GUI) thread."""
+        if len(directories) <= 1:
+            return [self._list_directory(directory, suffix) for directory in directories]
+        return list(self._scan_pool.map(lambda directory: self._list_directory(directory, suffix), directories))
+    
+    def _list_directory(self, directory: Path, suffix: str) -> List[str]:
+        """Return the sorted stems of files in directory ending with suffix.
+        Listings are cached and reused while the directory's mtime is unchanged. A listing is only
+        cached once the mtime is older than MTIME_RESOLUTION_NS: on filesystems with coarse
+        timestamps a file added in the same tick as the scan leaves the mtime unchanged."""
+        scan_time = time.time_ns()
+        try:
+            mtime = directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._dir_listing.pop(directory, None)
+            return []
+        cached = self._dir_listing.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        try:
+            with os.scandir(directory) as entries:
+                stems = sorted(entry.name[:-len(suffix)] for entry in entries
+                               if entry.name.endswith(suffix) and entry.name != f"__init__{suffix}"
+                               and entry.is_file())
+        except FileNotFoundError:
+            stems = []
+        if mtime < scan_time - MTIME_RESOLUTION_NS:
+            self._dir_listing[directory] = (mtime, stems)
+        else:
+            self._dir_listing.pop(directory, None)
+        return stems
+    
+    def update_compression(self, policy: str):
+        self.scenario_tool.compression = policy
     
     def select_directory(self):
         dir_name = QFileDialog.getExistingDirectory(
@@ -742,7 +538,7 @@ class ScenarioToolGUI(QMainWindow):
     
     def use_steam_directory(self):
         steam_path = self.get_steam_scenarios_path()
-        if steam_path.exists():
+        if os.path.isdir(steam_path):
             self.dir_input.setText(str(steam_path))
             self.update_save_directory()
         else:
@@ -752,30 +548,116 @@ class ScenarioToolGUI(QMainWindow):
         """Get the path to Steam's scenarios folder"""
         return Path.home() / "AppData" / "Local" / "sins2" / "drop_in_scenarios"
     
+    @staticmethod
+    def get_logical_drives() -> List[str]:
+        """Get the drive letters from C: to Z: that exist on this machine.
+        Network and optical drives are skipped, probing a disconnected share can block for seconds."""
+        letters = [chr(i) for i in range(ord('C'), ord('Z')+1)]
+        if sys.platform == 'win32':
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            mask = kernel32.GetLogicalDrives()
+            letters = [letter for letter in letters if mask & (1 << (ord(letter) - ord('A')))
+                       and kernel32.GetDriveTypeW(f"{letter}:\\") not in (DRIVE_REMOTE, DRIVE_CDROM)]
+        return [letter + ':' for letter in letters]
+    
+    @staticmethod
+    def get_epic_manifests_dir() -> Optional[Path]:
+        """Get the Epic Games Launcher manifests folder from the registry, or its default location"""
+        if sys.platform != 'win32':
+            return None
+        import winreg
+        try:
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE,
+                                r"SOFTWARE\WOW6432Node\Epic Games\EpicGamesLauncher") as key:
+                app_data_path = winreg.QueryValueEx(key, "AppDataPath")[0]
+            return Path(app_data_path) / "Manifests"
+        except OSError:
+            program_data = os.environ.get('PROGRAMDATA')
+            if not program_data:
+                return None
+            return Path(program_data) / "Epic/EpicGamesLauncher/Data/Manifests"
+    
+    @staticmethod
+    def _is_game_install(install: Dict[str, Any]) -> bool:
+        """Check whether an Epic install record belongs to Sins of a Solar Empire II"""
+        if not isinstance(install, dict):
+            return False
+        install_location = install.get('InstallLocation')
+        if not install_location:
+            return False
+        return (install.get('DisplayName', '').lower().startswith("sins of a solar empire ii")
+                or Path(install_location).name == "SinsOfASolarEmpire2")
+    
+    @staticmethod
+    def find_epic_install_dir() -> Optional[Path]:
+        """Find the game's install folder from the Epic Games Launcher install manifests,
+        falling back to the launcher's LauncherInstalled.dat list"""
+        manifests_dir = ScenarioToolGUI.get_epic_manifests_dir()
+        manifests = []
+        if manifests_dir is not None:
+            try:
+                with os.scandir(manifests_dir) as entries:
+                    manifests = [entry.path for entry in entries if entry.name.endswith('.item')]
+            except OSError:
+                pass
+        for manifest_path in manifests:
+            try:
+                manifest = fast_json.read(manifest_path)
+            except (OSError, ValueError):
+                continue
+            if ScenarioToolGUI._is_game_install(manifest):
+                return Path(manifest['InstallLocation'])
+        
+        program_data = os.environ.get('PROGRAMDATA')
+        if program_data:
+            try:
+                installed = fast_json.read(Path(program_data) / "Epic/UnrealEngineLauncher/LauncherInstalled.dat")
+            except (OSError, ValueError):
+                installed = {}
+            if not isinstance(installed, dict):
+                installed = {}
+            for install in installed.get('InstallationList') or []:
+                if ScenarioToolGUI._is_game_install(install):
+                    return Path(install['InstallLocation'])
+        return None
+    
     def get_epic_scenarios_path(self):
-        """Get the path to Epic's scenarios folder"""
-        # Check all drives from C to Z
-        for drive in (chr(i) + ':' for i in range(ord('C'), ord('Z')+1)):
-            epic_path = Path(f"{drive}/Program Files/Epic Games/SinsOfASolarEmpire2/drop_in_scenarios")
-            if epic_path.exists():
+        """Get the path to Epic's scenarios folder, searching again only until it has been found"""
+        if self._epic_scenarios_path is not None and os.path.isdir(self._epic_scenarios_path):
+            return self._epic_scenarios_path
+        
+        install_dir = self.find_epic_install_dir()
+        if install_dir is not None:
+            epic_path = install_dir / "drop_in_scenarios"
+            if os.path.isdir(epic_path):
+                self._epic_scenarios_path = epic_path
                 return epic_path
+        
+        # Fall back to the default install folder on the mounted drives
+        for drive in self.get_logical_drives():
+            epic_path = f"{drive}/Program Files/Epic Games/SinsOfASolarEmpire2/drop_in_scenarios"
+            if os.path.isdir(epic_path):
+                self._epic_scenarios_path = Path(epic_path)
+                return self._epic_scenarios_path
         # Return default path if not found
         return Path("C:/Program Files/Epic Games/SinsOfASolarEmpire2/drop_in_scenarios")
     
     def use_epic_directory(self):
         epic_path = self.get_epic_scenarios_path()
-        if epic_path.exists():
+        if os.path.isdir(epic_path):
             self.dir_input.setText(str(epic_path))
             self.update_save_directory()
         else:
             self.status_label.setText('Epic scenarios folder not found')
     
     def use_default_directory(self):
-        self.dir_input.setText(str(Path("output")))
+        self.dir_input.setText(DEFAULT_OUTPUT_DIR)
         self.update_save_directory()
     
     def save_as_template(self):
-        if not self.name_input.text():
+        template_name = self.name_input.text()
+        if not template_name:
             self.status_label.setText('Please enter a template name')
             logging.debug("Template save attempted without name")
             return
@@ -788,63 +670,78 @@ class ScenarioToolGUI(QMainWindow):
         # Save to user templates directory
         template_path = (self.scenario_tool.templates_dirs['user'] / 
                         self.scenario_tool.current_type / 
-                        f"{self.name_input.text()}.scenario")
+                        f"{template_name}.scenario")
         
-        logging.debug(f"Attempting to save template to: {template_path}")
+        logging.debug("Attempting to save template to: %s", template_path)
         
         if template_path.exists():
             self.status_label.setText('A template with this name already exists')
-            logging.debug(f"Template already exists at: {template_path}")
+            logging.debug("Template already exists at: %s", template_path)
             return
         
         try:
             template_path.parent.mkdir(parents=True, exist_ok=True)
-            if self.scenario_tool.create_scenario(template_path.stem, template_path.parent):
+            if self.scenario_tool.create_scenario(template_name, template_path.parent):
                 self.status_label.setText('Template saved successfully!')
                 self.update_template_list()
                 logging.debug("Template saved successfully")
         except Exception as e:
             self.status_label.setText(f'Error saving template: {e}')
-            logging.error(f"Error saving template: {e}", exc_info=True)
+            logging.error("Error saving template: %s", e, exc_info=True)
     
     def update_template_list(self):
         """Update the list of available templates"""
-        self.template_list.clear()
+        self._stale_template_dirs.clear()
         logging.debug("Updating template list")
         
-        all_templates = []
-        # Get templates from both user and community directories
-        for source, templates_dir in self.scenario_tool.templates_dirs.items():
-            # First, check for templates directly in templates directory
-            for template in templates_dir.glob("*.scenario"):
-                all_templates.append(f"{source}: {template.stem}")
-            
-            # Then check type subdirectories
+        # Each directory listing is already sorted, so visiting the groups in label order
+        # ("source/chart: ", "source/generator: ", "source: ") yields a sorted list without re-sorting
+        groups = []
+        for source, templates_dir in sorted(self.scenario_tool.templates_dirs.items()):
+            # Type subdirectories first, then templates directly in the templates directory
             for type_dir in ['chart', 'generator']:
-                type_path = templates_dir / type_dir
-                if type_path.exists():
-                    templates = [f"{source}/{type_dir}: {p.stem}" 
-                               for p in type_path.glob("*.scenario")]
-                    all_templates.extend(templates)
+                groups.append((f"{source}/{type_dir}: ", templates_dir / type_dir))
+            groups.append((f"{source}: ", templates_dir))
+        
+        all_templates = []
+        for (prefix, _dir), stems in zip(groups, self._list_directories([d for _, d in groups], ".scenario")):
+            all_templates.extend(prefix + stem for stem in stems)
         
-        logging.debug(f"Found all templates: {all_templates}")
-        self.template_list.addItems(sorted(all_templates))
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Found all templates: %s", all_templates)
+        # Suspend repaints so the list is laid out once for the whole batch
+        self.template_list.setUpdatesEnabled(False)
+        self.template_list.clear()
+        self.template_list.addItems(all_templates)
+        self.template_list.setUpdatesEnabled(True)
     
     def setup_file_watchers(self):
         """Setup watchers for scripts and templates directories"""
         self.watcher = QFileSystemWatcher()
         
-        # Add script directories
-        for scripts in self.scenario_tool.script_dirs.values():
-            for script_dir in scripts.values():
-                script_dir.mkdir(parents=True, exist_ok=True)
-                self.watcher.addPath(str(script_dir))
+        # Script directories
+        for source, scripts in self.scenario_tool.script_dirs.items():
+            for scenario_type, script_dir in scripts.items():
+                self._watched_dirs[script_dir] = ('scripts', source, scenario_type)
         
-        # Add template type directories
-        for templates_dir in self.scenario_tool.templates_dirs.values():
+        # Template type directories
+        for source, templates_dir in self.scenario_tool.templates_dirs.items():
             for type_dir in ['chart', 'generator']:
-                (templates_dir / type_dir).mkdir(parents=True, exist_ok=True)
-                self.watcher.addPath(str(templates_dir / type_dir))
+                self._watched_dirs[templates_dir / type_dir] = ('templates', source, type_dir)
+        
+        # Create any missing directories, then register them all with the watcher in one call
+        watch_paths = [str(directory) for directory in self._watched_dirs]
+        for directory in watch_paths:
+            if not os.path.isdir(directory):
+                os.makedirs(directory, exist_ok=True)
+        self.watcher.addPaths(watch_paths)
+        
+        # Coalesce bursts of directory events (editor saves, copies) into one refresh
+        self._pending_dirs = set()
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(150)
+        self._refresh_timer.timeout.connect(self._flush_directory_changes)
         
         # Connect signals
         self.watcher.directoryChanged.connect(self.handle_directory_change)
@@ -852,14 +749,83 @@ class ScenarioToolGUI(QMainWindow):
     def handle_directory_change(self, path):
         """Handle changes in watched directories"""
         path = Path(path)
-        logging.debug(f"Directory changed: {path}")
+        logging.debug("Directory changed: %s", path)
         
-        if path.parent.name == "scripts":
+        # Restart the timer so only the last event of a burst triggers a refresh
+        self._pending_dirs.add(path)
+        self._refresh_timer.start()
+    
+    def _flush_directory_changes(self):
+        """Rescan only the directories that changed and refresh each affected list once"""
+        for path in self._pending_dirs:
+            kind = self._watched_dirs.get(path)
+            if kind is None:
+                continue
+            # Skip spurious events: a cached listing is still valid while the mtime is unchanged
+            # (recently modified directories are never cached, see _list_directory)
+            try:
+                mtime = path.stat().st_mtime_ns
+            except OSError:
+                mtime = None
+            cached = self._dir_listing.get(path)
+            if cached is not None and cached[0] == mtime:
+                continue
+            list_kind, _source, scenario_type = kind
+            if list_kind == 'scripts':
+                # Only the current type's scripts are listed
+                if scenario_type == self.scenario_tool.current_type:
+                    self._scripts_dirty = True
+            else:
+                self._stale_template_dirs.add(path)
+                self.scenario_tool.invalidate_template_index()
+        self._pending_dirs.clear()
+        
+        self.refresh_dirty_lists()
+    
+    def refresh_dirty_lists(self):
+        """Rebuild the lists whose directories changed.
+        Deferred while the window is hidden or minimized; showing it again refreshes them."""
+        if not self.isVisible() or self.isMinimized():
+            return
+        if self._scripts_dirty:
             logging.debug("Updating script list due to directory change")
             self.update_script_list()
-        elif path.parent.name == "templates":
+        if self._stale_template_dirs:
             logging.debug("Updating template list due to directory change")
-            self.update_template_list()
+            self.sync_template_dirs()
+    
+    def sync_template_dirs(self):
+        """Apply only the added and removed templates of the changed directories to the list"""
+        changed = False
+        self.template_list.setUpdatesEnabled(False)
+        for directory in self._stale_template_dirs:
+            _list_kind, source, type_dir = self._watched_dirs[directory]
+            prefix = f"{source}/{type_dir}: "
+            listed = {item.text(): item for item in
+                      self.template_list.findItems(prefix, Qt.MatchFlag.MatchStartsWith)}
+            current = {prefix + stem for stem in self._list_directory(directory, ".scenario")}
+            
+            for name in listed.keys() - current:
+                self.template_list.takeItem(self.template_list.row(listed[name]))
+                changed = True
+            added = current - listed.keys()
+            if added:
+                self.template_list.addItems(list(added))
+                changed = True
+        self._stale_template_dirs.clear()
+        
+        if changed:
+            self.template_list.sortItems()
+        self.template_list.setUpdatesEnabled(True)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh_dirty_lists()
+    
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self.refresh_dirty_lists()
     
     def validate_value(self, value_str: str) -> tuple[Any, bool]:
         """Validate and convert a string input to the appropriate type.
@@ -868,16 +834,13 @@ class ScenarioToolGUI(QMainWindow):
         if value_str.lower() in ['true', 'false']:
             return value_str.lower() == 'true', True
         
-        # Handle numeric values
-        try:
-            # Try integer first
-            if value_str.isdigit() or (value_str.startswith('-') and value_str[1:].isdigit()):
-                return int(value_str), True
-            # Then try float
+        # Handle numeric values, matching the text first so plain strings skip the failed conversion
+        if INT_PATTERN.fullmatch(value_str):
+            return int(value_str), True
+        if FLOAT_PATTERN.fullmatch(value_str.strip()):
             return float(value_str), True
-        except ValueError:
-            # If not a number, return as string
-            return value_str, True
+        # If not a number, return as string
+        return value_str, True
     
     def apply_operation(self):
         logging.info("Apply operation button clicked")
@@ -891,7 +854,7 @@ class ScenarioToolGUI(QMainWindow):
             
             # Get operation parameters
             operation = Operation(self.operation_combo.currentText())
-            logging.debug(f"Operation: {operation}")
+            logging.debug("Operation: %s", operation)
             
             # Handle different operations and their validations
             if operation == Operation.ADD:
@@ -950,32 +913,33 @@ class ScenarioToolGUI(QMainWindow):
                         if self.scenario_tool.current_type == 'chart' 
                         else self.scenario_tool.working_dirs['generator'] / "galaxy_chart_generator_params.json")
             
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            
-            from scenarioOperations import apply_operation as apply_op
-            modified_data = apply_op(
-                data=data,
-                operation=operation,
-                target_property=target_prop,
-                filter_group=filter_group,
-                value=op_value
-            )
-            
-            with open(file_path, 'w') as f:
-                json.dump(modified_data, f, indent=4)
+            self.status_label.setText("Applying operation...")
+            self.set_script_controls_enabled(False)
             
-            # Update galaxy view
-            self.galaxy_viewer.set_data(modified_data)
-            self.galaxy_viewer._collect_node_positions()
-            self.galaxy_viewer.update()
-            
-            self.status_label.setText("Operation applied successfully!")
-            logging.info("Operation completed successfully")
+            # Load, modify and save the file on the thread pool so the window stays responsive
+            runner = OperationRunner(self.scenario_tool, file_path, operation, target_prop, filter_group, op_value)
+            runner.signals.finished.connect(self.on_operation_finished)
+            self._operation_runner = runner
+            QThreadPool.globalInstance().start(runner)
             
         except Exception as e:
             self.status_label.setText(f"Error applying operation: {str(e)}")
-            logging.error(f"Error applying operation: {str(e)}", exc_info=True)
+            logging.error("Error applying operation: %s", e, exc_info=True)
+    
+    @pyqtSlot(object, str)
+    def on_operation_finished(self, modified_data: Any, error: str):
+        """Update the UI once an operation finished running on the thread pool"""
+        self._operation_runner = None
+        self.set_script_controls_enabled(True)
+        if modified_data is None:
+            self.status_label.setText(f"Error applying operation: {error}")
+            return
+        
+        # Update galaxy view
+        self.galaxy_viewer.set_data(modified_data)
+        
+        self.status_label.setText("Operation applied successfully!")
+        logging.info("Operation completed successfully")
     
     def get_filter_group(self) -> FilterGroup:
         """Create a FilterGroup from the current WHERE clauses"""
@@ -994,10 +958,10 @@ class ScenarioToolGUI(QMainWindow):
                 # Validate the filter value
                 value, is_valid = self.validate_value(value_str)
                 if not is_valid:
-                    logging.warning(f"Invalid filter value: {value_str}")
+                    logging.warning("Invalid filter value: %s", value_str)
                     continue
                 
-                logging.debug(f"Adding filter: {property_name} {comparison.value} {value}")
+                logging.debug("Adding filter: %s %s %s", property_name, comparison.value, value)
                 filters.append(Filter(property_name, comparison, value))
 
         return FilterGroup(filters, LogicalOp.AND)
@@ -1086,14 +1050,22 @@ class ScenarioToolGUI(QMainWindow):
         """Save the galaxy data to the working directory"""
         try:
             chart_path = self.scenario_tool.working_dirs['chart'] / "galaxy_chart.json"
-            with open(chart_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            self.scenario_tool.write_json(chart_path, data)
             logging.debug("Saved galaxy data to working copy")
         except Exception as e:
-            logging.error(f"Failed to save galaxy data: {e}")
+            logging.error("Failed to save galaxy data: %s", e)
 
     def check_for_updates(self):
-        has_update, update_url = self.version_checker.check_for_updates()
+        """Start the update check on the thread pool, on_update_checked handles the result"""
+        runner = UpdateCheckRunner(self.version_checker)
+        runner.signals.finished.connect(self.on_update_checked)
+        self._update_check_runner = runner
+        QThreadPool.globalInstance().start(runner)
+    
+    @pyqtSlot(bool, object)
+    def on_update_checked(self, has_update: bool, update_url: Optional[str]):
+        """Offer the update once the check finished on the thread pool"""
+        self._update_check_runner = None
         if has_update:
             msg = QMessageBox(self)
             msg.setWindowTitle('Update Available')
@@ -1111,28 +1083,168 @@ class ScenarioToolGUI(QMainWindow):
         """Download community files using the version checker"""
         self.version_checker.download_community_files()
 
+class UpdateCheckRunnerSignals(QObject):
+    finished = pyqtSignal(bool, object)
+
+class UpdateCheckRunner(QRunnable):
+    """Checks for a new release on a thread pool and reports (has_update, update_url)"""
+    def __init__(self, version_checker: VersionChecker):
+        super().__init__()
+        self.version_checker = version_checker
+        self.signals = UpdateCheckRunnerSignals()
+    
+    def run(self):
+        try:
+            has_update, update_url = self.version_checker.check_for_updates()
+        except Exception:
+            logging.error("Error checking for updates", exc_info=True)
+            has_update, update_url = False, None
+        self.signals.finished.emit(has_update, update_url)
+
+class ScriptRunnerSignals(QObject):
+    finished = pyqtSignal(bool, str, float)
+
+class ScriptRunner(QRunnable):
+    """Runs a scenario script on a thread pool and reports (success, message, execution_time)"""
+    def __init__(self, scenario_tool, script_name: str):
+        super().__init__()
+        self.scenario_tool = scenario_tool
+        self.script_name = script_name
+        self.signals = ScriptRunnerSignals()
+    
+    def run(self):
+        try:
+            success, message, execution_time = self.scenario_tool.apply_script(self.script_name)
+        except Exception as e:
+            logging.error("Error in script execution", exc_info=True)
+            success, message, execution_time = False, f"Error running script: {str(e)}", 0.0
+        self.signals.finished.emit(success, message, execution_time)
+
+class OperationRunnerSignals(QObject):
+    finished = pyqtSignal(object, str)
+
+class OperationRunner(QRunnable):
+    """Applies an operation to a working file on a thread pool and reports (modified_data, error).
+    modified_data is None when the operation failed."""
+    def __init__(self, scenario_tool, file_path: Path, operation: Operation,
+                 target_property: str, filter_group: FilterGroup, value: Any):
+        super().__init__()
+        self.scenario_tool = scenario_tool
+        self.file_path = file_path
+        self.operation = operation
+        self.target_property = target_property
+        self.filter_group = filter_group
+        self.value = value
+        self.signals = OperationRunnerSignals()
+    
+    def run(self):
+        try:
+            # apply_operation modifies the document in place, so work on a private copy rather than
+            # the cached one; it only becomes the cached document once write_json succeeded
+            data = fast_json.read(self.file_path)
+            
+            modified_data = apply_operation(
+                data=data,
+                operation=self.operation,
+                target_property=self.target_property,
+                filter_group=self.filter_group,
+                value=self.value
+            )
+            
+            self.scenario_tool.write_json(self.file_path, modified_data)
+        except Exception as e:
+            logging.error("Error applying operation: %s", e, exc_info=True)
+            self.signals.finished.emit(None, str(e))
+            return
+        self.signals.finished.emit(modified_data, "")
+
+# Log row brushes per level, built once and shared by every row
+DEFAULT_LOG_BRUSH = QBrush(QColor('black'))
+LOG_LEVEL_BRUSHES = {
+    logging.DEBUG: QBrush(QColor('gray')),
+    logging.INFO: DEFAULT_LOG_BRUSH,
+    logging.WARNING: QBrush(QColor('orange')),
+    logging.ERROR: QBrush(QColor('red')),
+    logging.CRITICAL: QBrush(QColor('darkred'))
+}
+
+class LogRelay(QObject):
+    """Delivers formatted log records to the log widget on the GUI thread.
+    Records are batched every 50ms and the widget keeps at most max_rows rows."""
+    record_logged = pyqtSignal(str, int)
+    max_rows = 500
+    
+    def __init__(self, log_widget):
+        super().__init__(log_widget)
+        self.log_widget = log_widget
+        self.log_widget.setUniformItemSizes(True)
+        
+        self._pending = collections.deque(maxlen=self.max_rows)
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(50)
+        self._flush_timer.timeout.connect(self.flush)
+        
+        # Queued automatically when records are emitted from worker threads
+        self.record_logged.connect(self.queue_record)
+    
+    @pyqtSlot(str, int)
+    def queue_record(self, msg: str, levelno: int):
+        self._pending.append((msg, levelno))
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+    
+    def flush(self):
+        """Add all pending records in one batch and trim the oldest rows"""
+        records = list(self._pending)
+        self._pending.clear()
+        
+        self.log_widget.setUpdatesEnabled(False)
+        for msg, levelno in records:
+            # Color the row before it's added so the view never lays it out twice
+            item = QListWidgetItem(msg)
+            item.setForeground(LOG_LEVEL_BRUSHES.get(levelno, DEFAULT_LOG_BRUSH))
+            self.log_widget.addItem(item)
+        
+        for _ in range(self.log_widget.count() - self.max_rows):
+            self.log_widget.takeItem(0)
+        self.log_widget.setUpdatesEnabled(True)
+        self.log_widget.scrollToBottom()
+
 class GUILogHandler(logging.Handler):
     def __init__(self, log_widget):
         super().__init__()
         self.log_widget = log_widget
+        self.relay = LogRelay(log_widget)
         
     def emit(self, record):
         msg = self.format(record)
-        # Use different colors for different log levels
-        color = {
-            'DEBUG': 'gray',
-            'INFO': 'black',
-            'WARNING': 'orange',
-            'ERROR': 'red',
-            'CRITICAL': 'darkred'
-        }.get(record.levelname, 'black')
-        
-        self.log_widget.addItem(msg)
-        item = self.log_widget.item(self.log_widget.count() - 1)
-        item.setForeground(Qt.GlobalColor.red if 'ERROR' in msg else Qt.GlobalColor.black)
-        self.log_widget.scrollToBottom()
+        self.relay.record_logged.emit(msg, record.levelno)
+
+# Coordinate grid, 1000 game units between grid lines and 10 lines in each direction
+GRID_SIZE = 1000
+GRID_COUNT = 10
+GRID_EXTENT = GRID_SIZE * GRID_COUNT
+GRID_LINES = ([QLineF(i * GRID_SIZE, -GRID_EXTENT, i * GRID_SIZE, GRID_EXTENT) for i in range(-GRID_COUNT, GRID_COUNT + 1)]
+              + [QLineF(-GRID_EXTENT, i * GRID_SIZE, GRID_EXTENT, i * GRID_SIZE) for i in range(-GRID_COUNT, GRID_COUNT + 1)])
+AXIS_LINES = [QLineF(-GRID_EXTENT, 0, GRID_EXTENT, 0), QLineF(0, -GRID_EXTENT, 0, GRID_EXTENT)]
+
+# Cosmetic pens keep their on-screen width whatever the zoom, so they can be built once
+GRID_PEN = QPen(QColor(200, 200, 200), 1)
+GRID_PEN.setCosmetic(True)
+AXIS_PEN = QPen(QColor(100, 100, 100), 2)
+AXIS_PEN.setCosmetic(True)
 
 class GalaxyViewer(QWidget):
+    # Node color and base size per node kind, see _node_kind
+    NODE_STYLES = {
+        'star': (QColor(255, 255, 0), 15),       # Yellow and slightly larger for stars
+        'planet': (QColor(0, 255, 0), 10),       # Green for planets
+        'asteroid': (QColor(150, 150, 150), 10), # Gray for asteroids
+        'other': (QColor(255, 255, 255), 10)     # White for others
+    }
+    NODE_BRUSHES = {kind: QBrush(color) for kind, (color, _size) in NODE_STYLES.items()}
+    
     def __init__(self, parent=None, save_callback=None):
         super().__init__(parent)
         self.save_callback = save_callback
@@ -1144,6 +1256,12 @@ class GalaxyViewer(QWidget):
         self.drag_timer.setSingleShot(True)
         self.drag_timer.timeout.connect(self.start_node_drag)
         
+        # Repaints requested by mouse moves and wheel zooms are coalesced to about one per frame
+        self.repaint_timer = QTimer(self)
+        self.repaint_timer.setSingleShot(True)
+        self.repaint_timer.setInterval(16)
+        self.repaint_timer.timeout.connect(self.update)
+        
         # Add visibility flags first
         self.show_grid = True
         self.show_orbits = True
@@ -1160,6 +1278,8 @@ class GalaxyViewer(QWidget):
         self.last_pos = None
         self.node_positions = {}  # Cache for node positions
         self.parent_child_connections = []  # Cache for parent-child connections
+        self._lane_geometry = None  # Cache for orbit circles and phase lane lines
+        self.node_ids_by_kind = {}  # Node IDs to draw per node style, see _node_kind
         self.selected_node = None
         
         # Add selection variables
@@ -1289,62 +1409,79 @@ class GalaxyViewer(QWidget):
         self.show_regular_lanes = bool(state)
         self.update()
     
+    def _build_lane_geometry(self):
+        """Resolve the orbit circles and phase lane lines against the current node positions.
+        The result is reused by every paint until the data or a node position changes."""
+        node_positions = self.node_positions
+        central_pos = node_positions.get('0', QPointF(0.0, 0.0))
+        
+        # Orbits as (center, radius), connections involving the central star first
+        orbits = []
+        for parent_id, child_id in self.parent_child_connections:
+            if parent_id == '0' or child_id == '0':
+                other_pos = node_positions.get(child_id if parent_id == '0' else parent_id)
+                if other_pos:
+                    diff = other_pos - central_pos
+                    radius = (diff.x()**2 + diff.y()**2)**0.5
+                    if radius > 0:
+                        orbits.append((central_pos, radius))
+        for parent_id, child_id in self.parent_child_connections:
+            if parent_id != '0' and child_id != '0':
+                parent_pos = node_positions.get(parent_id)
+                child_pos = node_positions.get(child_id)
+                if parent_pos and child_pos:
+                    diff = parent_pos - child_pos
+                    radius = (diff.x()**2 + diff.y()**2)**0.5
+                    if radius > 0:
+                        orbits.append((parent_pos, radius))
+        
+        # Phase lanes grouped by type so each group is drawn with one pen and one call
+        lanes = collections.defaultdict(list)
+        for line in self.data.get('phase_lanes', ()):
+            node_a, node_b = str(line['node_a']), str(line['node_b'])
+            node_a_pos = node_positions.get(node_a, central_pos if node_a == '0' else None)
+            node_b_pos = node_positions.get(node_b, central_pos if node_b == '0' else None)
+            if node_a_pos is not None and node_b_pos is not None:
+                lanes[line.get('type', 'default')].append(QLineF(node_a_pos, node_b_pos))
+        
+        self._lane_geometry = (orbits, lanes)
+        return self._lane_geometry
+    
+    def _invalidate_geometry(self):
+        """Drop the cached lane geometry after node positions change"""
+        self._lane_geometry = None
+    
     def draw_phase_lanes(self, painter):
-        central_pos = self.node_positions.get('0', QPointF(0.0, 0.0))
+        orbits, lanes = self._lane_geometry or self._build_lane_geometry()
         
         # Draw parent-child connections as circles
         if self.show_orbits:
             painter.setPen(QPen(QColor(255, 255, 0), 1/self.zoom))  # Yellow for parent-child
-            
-            # First, draw all connections involving the central star
-            central_connections = [(p, c) for p, c in self.parent_child_connections if p == '0' or c == '0']
-            for parent_id, child_id in central_connections:
-                other_id = child_id if parent_id == '0' else parent_id
-                other_pos = self.node_positions.get(other_id)
-                if other_pos:
-                    diff = other_pos - central_pos
-                    radius = (diff.x()**2 + diff.y()**2)**0.5
-                    if radius > 0:
-                        painter.drawEllipse(central_pos, radius, radius)
-            
-            # Then draw all other connections
-            for parent_id, child_id in self.parent_child_connections:
-                if parent_id != '0' and child_id != '0':
-                    parent_pos = self.node_positions.get(parent_id)
-                    child_pos = self.node_positions.get(child_id)
-                    if parent_pos and child_pos:
-                        diff = parent_pos - child_pos
-                        radius = (diff.x()**2 + diff.y()**2)**0.5
-                        if radius > 0:
-                            painter.drawEllipse(parent_pos, radius, radius)
+            for center, radius in orbits:
+                painter.drawEllipse(center, radius, radius)
         
         # Draw phase lanes by type
-        if 'phase_lanes' in self.data:
-            for line in self.data['phase_lanes']:
-                line_type = line.get('type', 'default')
-                
-                # Skip if this type is not visible
-                if (line_type == 'star' and not self.show_star_lanes or
-                    line_type == 'wormhole' and not self.show_wormhole_lanes or
-                    line_type == 'default' and not self.show_regular_lanes):
-                    continue
-                
-                node_a_pos = self.node_positions.get(str(line['node_a']), central_pos if str(line['node_a']) == '0' else None)
-                node_b_pos = self.node_positions.get(str(line['node_b']), central_pos if str(line['node_b']) == '0' else None)
-                
-                if node_a_pos is not None and node_b_pos is not None:
-                    # Set line style based on type
-                    if line_type == 'wormhole':
-                        painter.setPen(QPen(QColor(128, 0, 128), 2/self.zoom))  # Purple for wormholes
-                    elif line_type == 'star':
-                        painter.setPen(QPen(QColor(255, 215, 0), 2/self.zoom))  # Thicker gold for star connections
-                    else:
-                        painter.setPen(QPen(QColor(0, 0, 255), 1/self.zoom))  # Blue for default
-                    
-                    painter.drawLine(node_a_pos, node_b_pos)
+        for line_type, lines in lanes.items():
+            # Skip if this type is not visible
+            if (line_type == 'star' and not self.show_star_lanes or
+                line_type == 'wormhole' and not self.show_wormhole_lanes or
+                line_type == 'default' and not self.show_regular_lanes):
+                continue
+            
+            # Set line style based on type
+            if line_type == 'wormhole':
+                painter.setPen(QPen(QColor(128, 0, 128), 2/self.zoom))  # Purple for wormholes
+            elif line_type == 'star':
+                painter.setPen(QPen(QColor(255, 215, 0), 2/self.zoom))  # Thicker gold for star connections
+            else:
+                painter.setPen(QPen(QColor(0, 0, 255), 1/self.zoom))  # Blue for default
+            
+            painter.drawLines(lines)
     
     def set_data(self, data):
         self.data = data
+        self._lane_geometry = None
+        self.node_ids_by_kind = {}
         self.node_positions.clear()
         self.parent_child_connections.clear()
         if self.data and 'root_nodes' in self.data:
@@ -1357,26 +1494,31 @@ class GalaxyViewer(QWidget):
         self.update()
         
     def _collect_node_positions(self):
-        def collect_positions(node):
-            if 'id' in node and 'position' in node:
-                node_id = str(node['id'])  # Convert ID to string
-                # Flip Y for display (negative Y in data becomes positive Y in display)
-                pos = QPointF(node['position'][0], -node['position'][1])
-                self.node_positions[node_id] = pos
-                
-                if 'child_nodes' in node:
-                    for child in node['child_nodes']:
-                        if 'id' in child and 'position' in child:
-                            connection = (node_id, str(child['id']))
-                            self.parent_child_connections.append(connection)
-                        collect_positions(child)
-        
-        self.node_positions.clear()
-        self.parent_child_connections.clear()
-        
-        # Process all nodes, including root nodes
-        for node in self.data['root_nodes']:
-            collect_positions(node)
+        node_positions = self.node_positions
+        connections = self.parent_child_connections
+        node_positions.clear()
+        connections.clear()
+        self._lane_geometry = None
+        node_ids_by_kind = self.node_ids_by_kind = {kind: [] for kind in self.NODE_STYLES}
+        
+        # Walk the tree with an explicit stack of (parent id, node) pairs, children are pushed
+        # in reverse so nodes and connections keep their document order
+        stack = [(None, node) for node in reversed(self.data['root_nodes'])]
+        while stack:
+            parent_id, node = stack.pop()
+            if 'id' not in node or 'position' not in node:
+                continue
+            node_id = str(node['id'])  # Convert ID to string
+            position = node['position']
+            # Flip Y for display (negative Y in data becomes positive Y in display)
+            node_positions[node_id] = QPointF(position[0], -position[1])
+            if parent_id is not None:
+                connections.append((parent_id, node_id))
+            node_ids_by_kind[self._node_kind(node)].append(node_id)
+            
+            children = node.get('child_nodes')
+            if children:
+                stack.extend((node_id, child) for child in reversed(children))
     
     def paintEvent(self, event):
         if not self.data:
@@ -1418,70 +1560,49 @@ class GalaxyViewer(QWidget):
             return
             
         # Draw coordinate grid
-        grid_size = 1000  # Game units between grid lines
-        grid_count = 10   # Number of grid lines in each direction
-        
-        painter.setPen(QPen(QColor(200, 200, 200), 1/self.zoom))
-        
-        for i in range(-grid_count, grid_count + 1):
-            # Vertical lines
-            painter.drawLine(i * grid_size, -grid_count * grid_size,
-                           i * grid_size, grid_count * grid_size)
-            # Horizontal lines
-            painter.drawLine(-grid_count * grid_size, i * grid_size,
-                           grid_count * grid_size, i * grid_size)
+        painter.setPen(GRID_PEN)
+        painter.drawLines(GRID_LINES)
         
         # Draw axes
-        painter.setPen(QPen(QColor(100, 100, 100), 2/self.zoom))
-        painter.drawLine(-grid_count * grid_size, 0, grid_count * grid_size, 0)
-        painter.drawLine(0, -grid_count * grid_size, 0, grid_count * grid_size)
+        painter.setPen(AXIS_PEN)
+        painter.drawLines(AXIS_LINES)
     
     def draw_nodes(self, painter):
         if 'root_nodes' not in self.data:
             return
         
-        # Create a flat list of all nodes first to avoid recursion issues
-        all_nodes = []
-        
-        def collect_nodes(node):
-            all_nodes.append(node)
-            if 'child_nodes' in node:
-                for child in node['child_nodes']:
-                    collect_nodes(child)
-        
-        # Collect all nodes
-        for node in self.data['root_nodes']:
-            collect_nodes(node)
-        
-        # Draw all nodes
-        for node in all_nodes:
-            pos = self.node_positions.get(str(node['id']), QPointF(0.0, 0.0))
-            
-            # Set node appearance based on type
-            node_size = 10  # Reduced base node size
-            if 'filling_name' in node:
-                if 'star' in node['filling_name']:
-                    color = QColor(255, 255, 0)  # Yellow for stars
-                    node_size = 15  # Slightly larger for stars
-                elif 'planet' in node['filling_name']:
-                    color = QColor(0, 255, 0)    # Green for planets
-                elif 'asteroid' in node['filling_name']:
-                    color = QColor(150, 150, 150) # Gray for asteroids
-                else:
-                    color = QColor(255, 255, 255) # White for others
-            else:
-                color = QColor(255, 255, 255)
-            
-            # Draw node
+        # Draw all nodes, with pen and brush set once per style
+        node_positions = self.node_positions
+        for kind, node_ids in self.node_ids_by_kind.items():
+            color, node_size = self.NODE_STYLES[kind]
             painter.setPen(QPen(color.darker(), 2/self.zoom))
-            painter.setBrush(QBrush(color))
-            painter.drawEllipse(pos, node_size/self.zoom, node_size/self.zoom)
+            painter.setBrush(self.NODE_BRUSHES[kind])
+            radius = node_size/self.zoom
+            for node_id in node_ids:
+                painter.drawEllipse(node_positions[node_id], radius, radius)
+    
+    @staticmethod
+    def _node_kind(node) -> str:
+        """Pick the node style from the node's filling name"""
+        if 'filling_name' in node:
+            if 'star' in node['filling_name']:
+                return 'star'
+            elif 'planet' in node['filling_name']:
+                return 'planet'
+            elif 'asteroid' in node['filling_name']:
+                return 'asteroid'
+        return 'other'
+    
+    def schedule_update(self):
+        """Repaint within the next frame, however many times this is called until then"""
+        if not self.repaint_timer.isActive():
+            self.repaint_timer.start()
     
     def wheelEvent(self, event):
         # Zoom in/out with mouse wheel
         factor = 1.2 if event.angleDelta().y() > 0 else 1/1.2
         self.zoom *= factor
-        self.update()
+        self.schedule_update()
     
     def keyPressEvent(self, event):
         if event.key() == Qt.Key.Key_Shift:
@@ -1536,7 +1657,7 @@ class GalaxyViewer(QWidget):
             delta = event.pos() - self.last_pos
             self.center_offset += QPointF(delta.x(), delta.y())
             self.last_pos = event.pos()
-            self.update()
+            self.schedule_update()
         elif self.dragging_node and self.drag_start_pos:
             # Move selected nodes
             world_pos = self.screen_to_world(event.pos())
@@ -1558,12 +1679,13 @@ class GalaxyViewer(QWidget):
                         node['position'][0],
                         -node['position'][1]
                     )
+            self._invalidate_geometry()
             
             # Update drag start position for next move
             self.drag_start_pos = world_pos
             
             self.update_node_info()
-            self.update()
+            self.schedule_update()
             
             # Save changes
             if self.save_callback:
@@ -1582,7 +1704,7 @@ class GalaxyViewer(QWidget):
                     self.selected_nodes.discard(node_id)
             
             self.update_node_info()
-            self.update()
+            self.schedule_update()
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.MouseButton.RightButton:
@@ -1600,7 +1722,7 @@ class GalaxyViewer(QWidget):
     def start_node_drag(self):
         """Called when drag timer expires to confirm node drag has started"""
         if self.dragging_node:
-            logging.debug(f"Started dragging node {self.dragging_node.get('id')}")
+            logging.debug("Started dragging node %s", self.dragging_node.get('id'))
     
     def screen_to_world(self, screen_pos):
         # Convert screen coordinates to world coordinates
@@ -1635,7 +1757,7 @@ class GalaxyViewer(QWidget):
         
         # Debug logging
         if closest_node:
-            logging.debug(f"Selected node: {closest_node.get('id', 'N/A')}")
+            logging.debug("Selected node: %s", closest_node.get('id', 'N/A'))
         else:
             logging.debug("No node selected")
     
@@ -1733,6 +1855,7 @@ class GalaxyViewer(QWidget):
                     if node:
                         node['position'][0] = x
                         self.node_positions[node_id] = QPointF(x, -node['position'][1])
+                self._invalidate_geometry()
                 self.update()
             elif key == "Position Y":
                 y = float(value)
@@ -1741,6 +1864,7 @@ class GalaxyViewer(QWidget):
                     if node:
                         node['position'][1] = y
                         self.node_positions[node_id] = QPointF(node['position'][0], -y)
+                self._invalidate_geometry()
                 self.update()
             else:
                 # For all other properties
@@ -1762,13 +1886,17 @@ class GalaxyViewer(QWidget):
                             node[key] = node.pop(old_key)
                         else:  # Value changed
                             node[key] = value
+                
+                # Renamed or changed properties can change a node's style
+                self._collect_node_positions()
+                self.update()
             
             # Save changes
             if self.save_callback:
                 self.save_callback(self.data)
             
         except (ValueError, KeyError) as e:
-            logging.error(f"Invalid value for {key}: {value}")
+            logging.error("Invalid value for %s: %s", key, value)
             self.update_node_info()  # Refresh to show original values
 
     def _add_new_property(self):
@@ -1,15 +1,14 @@
-import requests
 import json
 from pathlib import Path
 import sys
 import os
 import logging
-from packaging import version
 
 class VersionChecker:
     def __init__(self):
         self.github_api = "https://api.github.com/repos/ThreeHats/sins2-community-tools/releases/latest"
         self.current_version = "1.0.0"  # This will be updated during build
+        self.timeout = 10  # Seconds to wait for the update check before giving up
         self.app_dir = self._get_app_directory()
         
     def _get_app_directory(self):
@@ -26,7 +25,11 @@ class VersionChecker:
 
     def check_for_updates(self):
         try:
-            response = requests.get(self.github_api)
+            # Network modules are imported on first use so they don't slow down startup
+            import requests
+            from packaging import version
+            
+            response = requests.get(self.github_api, timeout=self.timeout)
             response.raise_for_status()
             latest = response.json()
             
@@ -38,10 +41,11 @@ class VersionChecker:
             return False, None
             
         except Exception as e:
-            logging.error(f"Failed to check for updates: {e}")
+            logging.error("Failed to check for updates: %s", e)
             return False, None
 
     def download_update(self, url):
+        import requests
         try:
             response = requests.get(url, stream=True)
             response.raise_for_status()
@@ -64,36 +68,38 @@ class VersionChecker:
             sys.exit(0)
             
         except Exception as e:
-            logging.error(f"Failed to download update: {e}")
+            logging.error("Failed to download update: %s", e)
             return False
 
     def download_community_files(self):
         """Download community files from GitHub repo"""
+        import requests
         base_url = "https://api.github.com/repos/ThreeHats/sins2-community-tools/contents/scenario-scripts/community"
         try:
-            logging.info(f"Attempting to download community files from: {base_url}")
+            logging.info("Attempting to download community files from: %s", base_url)
             response = requests.get(base_url)
             response.raise_for_status()
             contents = response.json()
             
             community_dir = self._get_app_directory() / "community"
-            logging.info(f"Creating community directory at: {community_dir}")
+            logging.info("Creating community directory at: %s", community_dir)
             community_dir.mkdir(exist_ok=True)
             
             for item in contents:
                 if item['type'] == 'dir':
-                    logging.info(f"Found directory: {item['name']}")
+                    logging.info("Found directory: %s", item['name'])
                     self._download_directory(item['url'], community_dir / item['name'])
                 else:
-                    logging.info(f"Skipping non-directory item: {item['name']}")
+                    logging.info("Skipping non-directory item: %s", item['name'])
                     
         except Exception as e:
-            logging.error(f"Failed to download community files: {e}", exc_info=True)
+            logging.error("Failed to download community files: %s", e, exc_info=True)
 
     def _download_directory(self, url: str, target_dir: Path):
         """Recursively download directory contents"""
+        import requests
         try:
-            logging.info(f"Downloading directory from {url} to {target_dir}")
+            logging.info("Downloading directory from %s to %s", url, target_dir)
             response = requests.get(url)
             response.raise_for_status()
             contents = response.json()
@@ -102,22 +108,23 @@ class VersionChecker:
             
             for item in contents:
                 if item['type'] == 'dir':
-                    logging.info(f"Found subdirectory: {item['name']}")
+                    logging.info("Found subdirectory: %s", item['name'])
                     self._download_directory(item['url'], target_dir / item['name'])
                 else:
-                    logging.info(f"Downloading file: {item['name']}")
+                    logging.info("Downloading file: %s", item['name'])
                     self._download_file(item['download_url'], target_dir / item['name'])
                 
         except Exception as e:
-            logging.error(f"Failed to download directory {url}: {e}", exc_info=True)
+            logging.error("Failed to download directory %s: %s", url, e, exc_info=True)
 
     def _download_file(self, url: str, target_path: Path):
         """Download a single file"""
+        import requests
         try:
-            logging.info(f"Downloading file from {url} to {target_path}")
+            logging.info("Downloading file from %s to %s", url, target_path)
             response = requests.get(url)
             response.raise_for_status()
             target_path.write_bytes(response.content)
-            logging.info(f"Successfully downloaded: {target_path.name}")
+            logging.info("Successfully downloaded: %s", target_path.name)
         except Exception as e:
-            logging.error(f"Failed to download file {url}: {e}", exc_info=True)
\ No newline at end of file
+            logging.error("Failed to download file %s: %s", url, e, exc_info=True)
\ No newline at end of file